@@ -0,0 +1,24 @@
+# gunicorn.conf.py
+"""
+Gunicorn configuration for the Flask RSA engine
+Author: Thomas Petermann
+
+Loaded automatically by `gunicorn main:app` when started from the flask/
+folder. Reads the same .env variables as main.py.
+
+A single worker process is used on purpose: the peer public key registered
+through /set_peer_public_key lives in process memory, so several workers
+would each see a different peer key. Concurrency comes from threads instead
+(one per CPU core), which keeps every request on the same state.
+"""
+
+import multiprocessing
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"0.0.0.0:{int(os.getenv('PORT', 5000))}"
+worker_class = "gthread"
+workers = 1
+threads = multiprocessing.cpu_count()
@@ -8,13 +8,24 @@ It exposes HTTP routes for:
 - Publishing the user's public key
 - Registering the peer's public key
 - Encrypting and decrypting messages
+
+Messages are split into OAEP blocks. Decrypting a long ciphertext fans its
+blocks out to a process pool: the private-key exponentiation holds the GIL,
+so only separate processes let it use several CPU cores. Encryption
+(e = 65537) and short ciphertexts are cheaper to handle inline.
 """
 
-from flask import Flask, request, jsonify
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import Flask, Response, request, jsonify
 import modules
 from dotenv import load_dotenv
 from flask_cors import CORS
+import json
+import multiprocessing
 import os
+import threading
+from typing import Optional
 
 # ----------------------------
 # Load environment variables
@@ -27,7 +38,63 @@ PORT = int(os.getenv("PORT", 5000))
 # Initialize RSA keys
 # ----------------------------
 public_key, private_key = modules.rsa_keys.get_or_create_keys(USER_ID, bits=1024)
-peer_public_key = None
+private_key_bytes = modules.rsa_codec.key_byte_length(private_key)
+# Peer key and its modulus size in bytes, swapped together as one record:
+# ((n, e), key_bytes)
+peer = None
+
+# ----------------------------
+# Static JSON responses (never change after startup)
+# ----------------------------
+_HEALTH_JSON = json.dumps({"status": "ok", "user_id": USER_ID}).encode("utf-8")
+_PUBKEY_JSON = json.dumps({
+    "user_id": USER_ID,
+    "public_key": {"n": str(public_key[0]), "e": str(public_key[1])}
+}).encode("utf-8")
+
+# ----------------------------
+# Worker pool for RSA decryption
+# ----------------------------
+# Pool processes are started lazily from a request thread. Forking a
+# multi-threaded process can deadlock, so workers come from a forkserver
+# (or are spawned where forkserver is unavailable, e.g. Windows).
+if "forkserver" in multiprocessing.get_all_start_methods():
+    _POOL_CONTEXT = multiprocessing.get_context("forkserver")
+    _POOL_CONTEXT.set_forkserver_preload(["modules"])
+else:
+    _POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def _new_pool() -> Optional[ProcessPoolExecutor]:
+    """Create the process pool used for RSA decryption (none on one core)."""
+    if (os.cpu_count() or 1) < 2:
+        return None
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=_POOL_CONTEXT)
+
+
+POOL = _new_pool()
+_POOL_LOCK = threading.Lock()
+
+
+def _call_with_pool(func, *args):
+    """
+    Call func(*args, executor=POOL).
+
+    If a pool process died, the executor is permanently broken: replace it
+    with a fresh pool (once, even if several threads notice) and retry.
+    """
+    global POOL
+    pool = POOL
+    try:
+        return func(*args, executor=pool)
+    except BrokenProcessPool:
+        with _POOL_LOCK:
+            if POOL is pool:
+                POOL = _new_pool()
+                pool.shutdown(wait=False)
+            pool = POOL
+        return func(*args, executor=pool)
+
 
 # ----------------------------
 # Initialize Flask app
@@ -42,28 +109,25 @@ CORS(app)
 @app.route("/health", methods=["GET"])
 def health():
     """Simple health check."""
-    return jsonify({"status": "ok", "user_id": USER_ID})
+    return Response(_HEALTH_JSON, mimetype="application/json")
 
 
 @app.route("/public_key", methods=["GET"])
 def get_public_key():
     """Return this user's public key."""
-    n, e = public_key
-    return jsonify({
-        "user_id": USER_ID,
-        "public_key": {"n": str(n), "e": str(e)}
-    })
+    return Response(_PUBKEY_JSON, mimetype="application/json")
 
 
 @app.route("/set_peer_public_key", methods=["POST"])
 def set_peer_public_key():
     """Save the peer's public key for encryption."""
-    global peer_public_key
+    global peer
     data = request.get_json()
     try:
         n = int(data["public_key"]["n"])
         e = int(data["public_key"]["e"])
         peer_public_key = (n, e)
+        peer = (peer_public_key, modules.rsa_codec.key_byte_length(peer_public_key))
         return jsonify({"status": "peer public key set"})
     except Exception as err:
         return jsonify({"error": f"invalid key data: {err}"}), 400
@@ -72,15 +136,16 @@ def set_peer_public_key():
 @app.route("/encrypt", methods=["POST"])
 def encrypt_message():
     """Encrypt a plaintext message using the peer's public key."""
-    global peer_public_key
-    if peer_public_key is None:
+    current_peer = peer
+    if current_peer is None:
         return jsonify({"error": "Peer public key not set"}), 400
+    peer_public_key, peer_key_bytes = current_peer
 
     data = request.get_json()
     plaintext = data.get("plaintext", "")
 
     try:
-        ciphertext_b64 = modules.rsa_codec.rsa_encrypt_b64(plaintext, peer_public_key)
+        ciphertext_b64 = modules.rsa_codec.rsa_encrypt_b64(plaintext, peer_public_key, peer_key_bytes)
         return jsonify({"ciphertext": ciphertext_b64})
     except Exception as err:
         return jsonify({"error": str(err)}), 500
@@ -93,7 +158,9 @@ def decrypt_message():
     ciphertext_b64 = data.get("ciphertext", "")
 
     try:
-        plaintext = modules.rsa_codec.rsa_decrypt_b64(ciphertext_b64, private_key)
+        plaintext = _call_with_pool(
+            modules.rsa_codec.rsa_decrypt_b64, ciphertext_b64, private_key, private_key_bytes
+        )
         return jsonify({"plaintext": plaintext})
     except Exception as err:
         return jsonify({"error": str(err)}), 500
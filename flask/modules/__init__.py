@@ -7,7 +7,8 @@ Exposes RSA core components as a unified import.
 """
 
 from . import rsa_math
+from . import rsa_keyfile
 from . import rsa_keys
 from . import rsa_codec
 
-__all__ = ["rsa_math", "rsa_keys", "rsa_codec"]
+__all__ = ["rsa_math", "rsa_keyfile", "rsa_keys", "rsa_codec"]
@@ -1,4 +1,4 @@
-# modules/codec.py
+# modules/rsa_codec.py
 
 """
 RSA encryption and decryption module
@@ -8,16 +8,16 @@ This module is responsible for:
 - Encrypting messages using a public RSA key
 - Decrypting ciphertexts using a private RSA key
 - Handling Base64 encoding for easier storage and transmission
-- Ensuring secure use of RSA (OAEP padding)
+- Ensuring secure use of RSA (OAEP padding, SHA-256 / MGF1)
 - Providing utility functions to load keys from files
 
 Functions:
 
 - load_public_key(path):
-    Load a public key (n, e) from a .bin file.
+    Load a public key (n, e) from a .bin key file.
 
 - load_private_key(path):
-    Load a private key (n, d) from a .bin file.
+    Load a private key (n, d) or (n, d, p, q, dp, dq, qinv) from a .bin key file.
 
 - rsa_encrypt(message, public_key):
     Encrypt a plaintext message using the given public key (n, e).
@@ -25,18 +25,62 @@ Functions:
 - rsa_decrypt(ciphertext, private_key):
     Decrypt a ciphertext (integer) using the given private key (n, d).
 
-- rsa_encrypt_b64(message, public_key):
-    Encrypt a plaintext message, return Base64-encoded ciphertext.
+- rsa_decrypt_crt(ciphertext, private_key):
+    Decrypt a ciphertext (integer) using the CRT form of the private key
+    (n, d, p, q, dp, dq, qinv).
 
-- rsa_decrypt_b64(ciphertext_b64, private_key):
-    Decrypt a Base64-encoded ciphertext and return plaintext.
+- rsa_encrypt_block(block, public_key, key_bytes):
+    OAEP-pad and encrypt one block of bytes.
+
+- rsa_decrypt_block(block, private_key, key_bytes):
+    Decrypt one ciphertext block and remove its OAEP padding.
+
+- key_byte_length(key):
+    Return the size of the key's modulus n in bytes.
+
+- rsa_encrypt_b64(message, public_key, key_bytes=None):
+    Encrypt a plaintext message with OAEP, return Base64-encoded ciphertext.
+
+- rsa_decrypt_b64(ciphertext_b64, private_key, key_bytes=None, executor=None):
+    Decrypt a Base64-encoded OAEP ciphertext and return plaintext.
 """
 
-import base64
-from typing import Tuple
+import binascii
+import hashlib
+import hmac
+import os
+from concurrent.futures import Executor
+from functools import lru_cache
+from itertools import repeat
+from typing import Optional, Tuple
+
+import gmpy2
+
+from . import rsa_keyfile
 
-PublicKey = Tuple[int, int]   # (n, e)
-PrivateKey = Tuple[int, int]  # (n, d)
+PublicKey = Tuple[int, int]         # (n, e)
+PrivateKey = Tuple[int, ...]        # (n, d) or (n, d, p, q, dp, dq, qinv)
+
+# OAEP parameters (RFC 8017): SHA-256 for both the label hash and MGF1
+OAEP_HASH = hashlib.sha256
+OAEP_HASH_LEN = OAEP_HASH().digest_size
+OAEP_LABEL_HASH = OAEP_HASH(b"").digest()
+
+# Dispatching work to a process pool costs about as much as decrypting one
+# 1024-bit block (~170 us vs ~195 us), so smaller ciphertexts are decrypted
+# inline even when an executor is given.
+POOL_MIN_BLOCKS = 4
+
+
+@lru_cache(maxsize=8)
+def _gmp_private_key(private_key: PrivateKey) -> Tuple[gmpy2.mpz, ...]:
+    """
+    Convert a private key to gmpy2 integers once and reuse them.
+
+    The server decrypts many messages with the same key, so the conversion
+    is cached per process (including each worker of a process pool).
+    """
+    return tuple(gmpy2.mpz(value) for value in private_key)
 
 
 # -----------------------------------------------------------------------------
@@ -44,34 +88,40 @@ PrivateKey = Tuple[int, int]  # (n, d)
 # -----------------------------------------------------------------------------
 def load_public_key(path: str) -> PublicKey:
     """
-    Load a public RSA key from a binary file.
+    Load a public RSA key from a .bin key file.
 
-    The file must contain two integers (n and e), separated by a newline.
+    The file holds the integers n and e, in the binary format written by
+    rsa_keys.save_keys (see rsa_keyfile) or in the legacy text format
+    (one decimal integer per line).
 
-    Example file content:
-        1234567890123456789
-        65537
+    Raises:
+        ValueError if the file is malformed.
     """
-    with open(path, "r") as f:
-        n = int(f.readline().strip())
-        e = int(f.readline().strip())
+    with open(path, "rb") as f:
+        fields = rsa_keyfile.unpack_ints(f.read())
+    if len(fields) < 2:
+        raise ValueError(f"Invalid public key file format: {path}")
+    n, e = fields[:2]
     return n, e
 
 
 def load_private_key(path: str) -> PrivateKey:
     """
-    Load a private RSA key from a binary file.
+    Load a private RSA key from a .bin key file.
 
-    The file must contain two integers (n and d), separated by a newline.
+    The file holds either (n, d) or the CRT form (n, d, p, q, dp, dq, qinv),
+    in the binary format written by rsa_keys.save_keys (see rsa_keyfile) or
+    in the legacy text format (one decimal integer per line). All values are
+    returned, so keys with CRT parameters decrypt through the CRT path.
 
-    Example file content:
-        1234567890123456789
-        123456789
+    Raises:
+        ValueError if the file is malformed.
     """
-    with open(path, "r") as f:
-        n = int(f.readline().strip())
-        d = int(f.readline().strip())
-    return n, d
+    with open(path, "rb") as f:
+        fields = rsa_keyfile.unpack_ints(f.read())
+    if len(fields) not in (2, 7):
+        raise ValueError(f"Invalid private key file format: {path}")
+    return tuple(fields)
 
 
 # -----------------------------------------------------------------------------
@@ -98,12 +148,36 @@ def rsa_encrypt(message: str, public_key: PublicKey) -> int:
     if message_int >= n:
         raise ValueError("Message too large for the key size.")
 
-    # Perform RSA encryption: c = m^e mod n
-    ciphertext_int = pow(message_int, e, n)
+    # Perform RSA encryption: c = m^e mod n (GMP modular exponentiation).
+    # For e = 65537 GMP already does 16 squarings and one multiply; an
+    # explicit square-and-multiply loop over mpz measured slower than this.
+    ciphertext_int = int(gmpy2.powmod(message_int, e, n))
 
     return ciphertext_int
 
 
+def _decrypt_int(ciphertext: int, private_key: PrivateKey) -> int:
+    """
+    Raw RSA private-key operation m = c^d mod n, using CRT when available.
+
+    The secret exponents are applied with gmpy2.powmod_sec (GMP's
+    mpz_powm_sec), whose running time does not depend on their bits.
+    """
+    if len(private_key) < 7:
+        n, d = _gmp_private_key(private_key)[:2]
+        return int(gmpy2.powmod_sec(ciphertext, d, n))
+
+    _, _, p, q, dp, dq, qinv = _gmp_private_key(private_key)
+
+    # Half-size exponentiations: m_p = c^dp mod p, m_q = c^dq mod q
+    sp = gmpy2.powmod_sec(ciphertext, dp, p)
+    sq = gmpy2.powmod_sec(ciphertext, dq, q)
+
+    # Garner recombination: m = m_q + q * ((m_p - m_q) * qinv mod p)
+    h = ((sp - sq) * qinv) % p
+    return int(sq + h * q)
+
+
 def rsa_decrypt(ciphertext: int, private_key: PrivateKey) -> str:
     """
     Decrypt an RSA ciphertext integer using the private key (n, d).
@@ -115,10 +189,33 @@ def rsa_decrypt(ciphertext: int, private_key: PrivateKey) -> str:
     Returns:
         str: The decrypted plaintext message.
     """
-    n, d = private_key
+    # Perform RSA decryption: m = c^d mod n (no CRT, even if the key has it)
+    message_int = _decrypt_int(ciphertext, private_key[:2])
 
-    # Perform RSA decryption: m = c^d mod n
-    message_int = pow(ciphertext, d, n)
+    # Convert the integer back to a UTF-8 string
+    message_bytes = message_int.to_bytes((message_int.bit_length() + 7) // 8, byteorder="big")
+    plaintext = message_bytes.decode("utf-8")
+
+    return plaintext
+
+
+def rsa_decrypt_crt(ciphertext: int, private_key: PrivateKey) -> str:
+    """
+    Decrypt an RSA ciphertext integer using the Chinese Remainder Theorem.
+
+    Two half-size exponentiations modulo p and q are recombined with
+    Garner's formula, which is roughly four times faster than a single
+    exponentiation modulo n. Keys without CRT parameters (n, d) use a
+    single exponentiation modulo n instead.
+
+    Args:
+        ciphertext (int): The encrypted message as an integer.
+        private_key (tuple): The private key (n, d, p, q, dp, dq, qinv).
+
+    Returns:
+        str: The decrypted plaintext message.
+    """
+    message_int = _decrypt_int(ciphertext, private_key)
 
     # Convert the integer back to a UTF-8 string
     message_bytes = message_int.to_bytes((message_int.bit_length() + 7) // 8, byteorder="big")
@@ -127,45 +224,201 @@ def rsa_decrypt(ciphertext: int, private_key: PrivateKey) -> str:
     return plaintext
 
 
+# -----------------------------------------------------------------------------
+# OAEP padding and block pipeline
+# -----------------------------------------------------------------------------
+def _mgf1(seed: bytes, length: int) -> bytes:
+    """
+    MGF1 mask generation function (RFC 8017, B.2.1) based on OAEP_HASH.
+    """
+    output = bytearray()
+    counter = 0
+    while len(output) < length:
+        output += OAEP_HASH(seed + counter.to_bytes(4, byteorder="big")).digest()
+        counter += 1
+    return bytes(output[:length])
+
+
+def _xor(a: bytes, b: bytes) -> bytes:
+    """
+    XOR two byte strings of the same length.
+    """
+    return (int.from_bytes(a, byteorder="big") ^ int.from_bytes(b, byteorder="big")).to_bytes(len(a), byteorder="big")
+
+
+def oaep_max_chunk(key_bytes: int) -> int:
+    """
+    Return the largest plaintext (in bytes) that fits in one OAEP block.
+    """
+    return key_bytes - 2 * OAEP_HASH_LEN - 2
+
+
+def _oaep_encode(message: bytes, key_bytes: int) -> bytes:
+    """
+    EME-OAEP encoding (RFC 8017, 7.1.1) with an empty label.
+
+    EM = 0x00 || maskedSeed || maskedDB
+    """
+    padding = bytes(key_bytes - len(message) - 2 * OAEP_HASH_LEN - 2)
+    db = OAEP_LABEL_HASH + padding + b"\x01" + message
+    seed = os.urandom(OAEP_HASH_LEN)
+    masked_db = _xor(db, _mgf1(seed, len(db)))
+    masked_seed = _xor(seed, _mgf1(masked_db, OAEP_HASH_LEN))
+    return b"\x00" + masked_seed + masked_db
+
+
+def _oaep_decode(encoded: bytes) -> bytes:
+    """
+    EME-OAEP decoding (RFC 8017, 7.1.2) with an empty label.
+
+    All failures raise the same error so the cause is not revealed.
+    """
+    masked_seed = encoded[1:1 + OAEP_HASH_LEN]
+    masked_db = encoded[1 + OAEP_HASH_LEN:]
+    seed = _xor(masked_seed, _mgf1(masked_db, OAEP_HASH_LEN))
+    db = _xor(masked_db, _mgf1(seed, len(masked_db)))
+
+    label_hash = db[:OAEP_HASH_LEN]
+    separator = db.find(b"\x01", OAEP_HASH_LEN)
+    if (
+        encoded[0] != 0
+        or not hmac.compare_digest(label_hash, OAEP_LABEL_HASH)
+        or separator == -1
+        or db[OAEP_HASH_LEN:separator].strip(b"\x00")
+    ):
+        raise ValueError("Decryption error.")
+    return db[separator + 1:]
+
+
+def rsa_encrypt_block(block: bytes, public_key: PublicKey, key_bytes: int) -> bytes:
+    """
+    OAEP-pad one block of plaintext bytes and encrypt it.
+
+    Args:
+        block (bytes): At most oaep_max_chunk(key_bytes) bytes of plaintext.
+        public_key (tuple): The public key (n, e).
+        key_bytes (int): key_byte_length(public_key).
+
+    Returns:
+        bytes: The ciphertext block, exactly key_bytes long.
+    """
+    n, e = public_key
+    encoded_int = int.from_bytes(_oaep_encode(block, key_bytes), byteorder="big")
+    ciphertext_int = int(gmpy2.powmod(encoded_int, e, n))
+    return ciphertext_int.to_bytes(key_bytes, byteorder="big")
+
+
+def rsa_decrypt_block(block: bytes, private_key: PrivateKey, key_bytes: int) -> bytes:
+    """
+    Decrypt one ciphertext block and strip its OAEP padding.
+
+    Args:
+        block (bytes): A ciphertext block of exactly key_bytes bytes.
+        private_key (tuple): The private key (n, d) or (n, d, p, q, dp, dq, qinv).
+        key_bytes (int): key_byte_length(private_key).
+
+    Returns:
+        bytes: The plaintext bytes carried by this block.
+    """
+    ciphertext_int = int.from_bytes(block, byteorder="big")
+    if ciphertext_int >= private_key[0]:
+        raise ValueError("Decryption error.")
+    encoded_int = _decrypt_int(ciphertext_int, private_key)
+    return _oaep_decode(encoded_int.to_bytes(key_bytes, byteorder="big"))
+
+
 # -----------------------------------------------------------------------------
 # Base64 wrappers (useful for saving / exchanging ciphertexts as text)
 # -----------------------------------------------------------------------------
-def rsa_encrypt_b64(message: str, public_key: PublicKey) -> str:
+def key_byte_length(key: Tuple[int, ...]) -> int:
+    """
+    Return the size in bytes of the modulus n of a public or private key.
+
+    Callers that reuse the same key for many messages can compute this once
+    and pass it to the Base64 wrappers as key_bytes.
+    """
+    return (key[0].bit_length() + 7) // 8
+
+
+def rsa_encrypt_b64(message: str, public_key: PublicKey, key_bytes: Optional[int] = None) -> str:
     """
     Encrypt a plaintext message using the RSA public key (n, e)
     and return the ciphertext encoded in Base64 for easier transport.
 
+    The UTF-8 message is split into chunks of oaep_max_chunk(key_bytes)
+    bytes; each chunk is OAEP-padded and encrypted into one key-sized
+    block, so messages of any length are supported. Blocks are always
+    encrypted inline: with e = 65537 one block costs tens of microseconds,
+    less than handing it to another process.
+
     Args:
         message (str): The plaintext message.
         public_key (tuple): The public key (n, e).
+        key_bytes (int, optional): Cached key_byte_length(public_key).
 
     Returns:
         str: The Base64-encoded ciphertext.
     """
-    ciphertext_int = rsa_encrypt(message, public_key)
+    if key_bytes is None:
+        key_bytes = key_byte_length(public_key)
+
+    chunk_size = oaep_max_chunk(key_bytes)
+    if chunk_size <= 0:
+        raise ValueError("Key size is too small for OAEP padding.")
 
-    # Convert integer ciphertext to bytes, then to Base64
-    ciphertext_bytes = ciphertext_int.to_bytes((ciphertext_int.bit_length() + 7) // 8, byteorder="big")
-    ciphertext_b64 = base64.b64encode(ciphertext_bytes).decode("utf-8")
+    data = message.encode("utf-8")
+    chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)] or [b""]
+
+    blocks = map(rsa_encrypt_block, chunks, repeat(public_key), repeat(key_bytes))
+
+    # Concatenate the fixed-size blocks, then convert to Base64 in a single
+    # binascii call (no intermediate copy, no trailing newline)
+    ciphertext_bytes = b"".join(blocks)
+    ciphertext_b64 = binascii.b2a_base64(ciphertext_bytes, newline=False).decode("ascii")
 
     return ciphertext_b64
 
 
-def rsa_decrypt_b64(ciphertext_b64: str, private_key: PrivateKey) -> str:
+def rsa_decrypt_b64(
+    ciphertext_b64: str,
+    private_key: PrivateKey,
+    key_bytes: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> str:
     """
-    Decrypt a Base64-encoded ciphertext using the RSA private key (n, d).
+    Decrypt a Base64-encoded OAEP ciphertext using the RSA private key.
+
+    The ciphertext is split into key-sized blocks, each one is decrypted
+    and the plaintext chunks are joined before UTF-8 decoding. When an
+    executor is given and there are at least POOL_MIN_BLOCKS blocks, they
+    are decrypted in parallel, one batch per CPU core.
 
     Args:
         ciphertext_b64 (str): The ciphertext encoded in Base64.
-        private_key (tuple): The private key (n, d).
+        private_key (tuple): The private key (n, d) or (n, d, p, q, dp, dq, qinv).
+        key_bytes (int, optional): Cached key_byte_length(private_key).
+        executor (Executor, optional): Pool used to decrypt the blocks.
 
     Returns:
         str: The decrypted plaintext message.
     """
-    # Decode Base64 to bytes, then to integer
-    ciphertext_bytes = base64.b64decode(ciphertext_b64)
-    ciphertext_int = int.from_bytes(ciphertext_bytes, byteorder="big")
-
-    plaintext = rsa_decrypt(ciphertext_int, private_key)
+    if key_bytes is None:
+        key_bytes = key_byte_length(private_key)
+
+    # Decode Base64 to bytes, then split into key-sized blocks
+    ciphertext_bytes = binascii.a2b_base64(ciphertext_b64)
+    if not ciphertext_bytes or len(ciphertext_bytes) % key_bytes:
+        raise ValueError("Ciphertext length is not a multiple of the key size.")
+    blocks = [ciphertext_bytes[i:i + key_bytes] for i in range(0, len(ciphertext_bytes), key_bytes)]
+
+    if executor is not None and len(blocks) >= POOL_MIN_BLOCKS:
+        chunksize = -(-len(blocks) // (os.cpu_count() or 1))
+        chunks = executor.map(
+            rsa_decrypt_block, blocks, repeat(private_key), repeat(key_bytes), chunksize=chunksize
+        )
+    else:
+        chunks = map(rsa_decrypt_block, blocks, repeat(private_key), repeat(key_bytes))
+
+    plaintext = b"".join(chunks).decode("utf-8")
 
     return plaintext
@@ -0,0 +1,68 @@
+# modules/rsa_keyfile.py
+
+"""
+RSA key file format module
+Author: Thomas Petermann
+
+This module is responsible for:
+- Serializing key integers to the binary .bin key file format
+- Parsing key files, in both the binary and the legacy text format
+
+Each integer is stored as a 4-byte big-endian length header followed by
+that many bytes of the value itself (big-endian). Older key files hold one
+decimal integer per line; they are still accepted when reading.
+
+Functions:
+
+- pack_ints(values):
+    Serialize integers to the binary key file format.
+
+- unpack_ints(raw):
+    Parse the content of a key file (binary or legacy text) into integers.
+"""
+
+import struct
+from typing import List, Tuple
+
+
+def pack_ints(values: Tuple[int, ...]) -> bytes:
+    """
+    Serialize integers as raw big-endian bytes.
+
+    Each value is written as a 4-byte big-endian length header followed by
+    that many bytes of the value itself.
+    """
+    chunks = []
+    for value in values:
+        nbytes = (value.bit_length() + 7) // 8
+        chunks.append(struct.pack(">I", nbytes))
+        chunks.append(value.to_bytes(nbytes, byteorder="big"))
+    return b"".join(chunks)
+
+
+def unpack_ints(raw: bytes) -> List[int]:
+    """
+    Parse the content of a key file into integers.
+
+    Accepts the binary format written by pack_ints as well as the legacy
+    text format (one decimal integer per line), which is recognised by its
+    first non-blank byte being a digit.
+
+    Raises:
+        ValueError if the binary content is truncated.
+    """
+    if raw.lstrip()[:1].isdigit():
+        return [int(field) for field in raw.split()]
+
+    values = []
+    offset = 0
+    while offset < len(raw):
+        if offset + 4 > len(raw):
+            raise ValueError("Truncated key file.")
+        (nbytes,) = struct.unpack_from(">I", raw, offset)
+        offset += 4
+        if offset + nbytes > len(raw):
+            raise ValueError("Truncated key file.")
+        values.append(int.from_bytes(raw[offset:offset + nbytes], byteorder="big"))
+        offset += nbytes
+    return values
@@ -31,10 +31,11 @@ Functions:
 
 import os
 from . import rsa_math
+from . import rsa_keyfile
 from typing import Tuple
 
-PublicKey = Tuple[int, int]   # (n, e)
-PrivateKey = Tuple[int, int]  # (n, d)
+PublicKey = Tuple[int, int]         # (n, e)
+PrivateKey = Tuple[int, ...]        # (n, d) or (n, d, p, q, dp, dq, qinv)
 
 
 def generate_keypair(bits: int) -> Tuple[PublicKey, PrivateKey]:
@@ -47,12 +48,13 @@ def generate_keypair(bits: int) -> Tuple[PublicKey, PrivateKey]:
     - Compute phi(n) = (p - 1) * (q - 1).
     - Choose a public exponent e such that gcd(e, phi(n)) == 1.
     - Compute the private exponent d as the modular inverse of e modulo phi(n).
+    - Precompute the CRT parameters dp, dq and qinv used for fast decryption.
 
     Returns:
         (public_key, private_key)
         where:
             public_key  = (n, e)
-            private_key = (n, d)
+            private_key = (n, d, p, q, dp, dq, qinv)
     """
     if bits < 8:
         raise ValueError("Key size is too small; use at least 8 bits for testing.")
@@ -84,20 +86,26 @@ def generate_keypair(bits: int) -> Tuple[PublicKey, PrivateKey]:
     # Compute the private exponent d as the modular inverse of e modulo phi(n)
     d = rsa_math.modinv(e, phi)
 
+    # CRT parameters: decryption works modulo p and q separately
+    dp = d % (p - 1)
+    dq = d % (q - 1)
+    qinv = rsa_math.modinv(q, p)
+
     public_key: PublicKey = (n, e)
-    private_key: PrivateKey = (n, d)
+    private_key: PrivateKey = (n, d, p, q, dp, dq, qinv)
 
     return public_key, private_key
 
 
-def _get_key_paths(user_id: str, directory: str = "keys") -> Tuple[str, str]:
+def _build_paths(user_id: str, directory: str = "keys") -> Tuple[str, str]:
     """
     Internal helper to build file paths for the user's key files.
 
+    Pure path computation: the directory is only created by save_keys.
+
     Returns:
         (public_key_path, private_key_path)
     """
-    os.makedirs(directory, exist_ok=True)
     public_path = os.path.join(directory, f"{user_id}_public.bin")
     private_path = os.path.join(directory, f"{user_id}_private.bin")
     return public_path, private_path
@@ -110,7 +118,7 @@ def keys_exist(user_id: str, directory: str = "keys") -> bool:
     Returns:
         True if both public and private key files are present, False otherwise.
     """
-    public_path, private_path = _get_key_paths(user_id, directory)
+    public_path, private_path = _build_paths(user_id, directory)
     return os.path.isfile(public_path) and os.path.isfile(private_path)
 
 
@@ -123,34 +131,42 @@ def save_keys(
     """
     Save the public and private keys to .bin files on disk.
 
-    The keys are stored in a simple text-based format:
-        public:  "n\n e\n"
-        private: "n\n d\n"
+    Each integer is stored as a 4-byte big-endian length followed by its
+    raw big-endian bytes (see rsa_keyfile.pack_ints):
+        public:  n, e
+        private: n, d, followed by p, q, dp, dq, qinv when the private key
+                 carries its CRT parameters
 
-    Even if the extension is .bin, the content is plain text for simplicity
-    and easier debugging. This is acceptable for an educational project.
+    Parsing raw bytes at load time is linear in the key size, unlike the
+    decimal text format used previously (which load_keys still accepts).
     """
-    public_path, private_path = _get_key_paths(user_id, directory)
+    public_path, private_path = _build_paths(user_id, directory)
     n_pub, e = public_key
-    n_priv, d = private_key
+    n_priv = private_key[0]
 
     # For RSA, n should be the same in both keys
     if n_pub != n_priv:
         raise ValueError("Public and private keys do not share the same modulus n.")
 
+    os.makedirs(directory, exist_ok=True)
+
     # Write public key
-    with open(public_path, "w", encoding="utf-8") as f_pub:
-        f_pub.write(f"{n_pub}\n{e}\n")
+    with open(public_path, "wb") as f_pub:
+        f_pub.write(rsa_keyfile.pack_ints(public_key))
 
     # Write private key (never shared)
-    with open(private_path, "w", encoding="utf-8") as f_priv:
-        f_priv.write(f"{n_priv}\n{d}\n")
+    with open(private_path, "wb") as f_priv:
+        f_priv.write(rsa_keyfile.pack_ints(private_key))
 
 
 def load_keys(user_id: str, directory: str = "keys") -> Tuple[PublicKey, PrivateKey]:
     """
     Load the public and private keys for the given user_id from .bin files.
 
+    Both the binary format written by save_keys and the legacy decimal text
+    format are accepted. The private key may hold either (n, d) or the CRT
+    form (n, d, p, q, dp, dq, qinv).
+
     Returns:
         (public_key, private_key)
 
@@ -158,32 +174,30 @@ def load_keys(user_id: str, directory: str = "keys") -> Tuple[PublicKey, Private
         FileNotFoundError if the key files do not exist.
         ValueError if the files are malformed.
     """
-    public_path, private_path = _get_key_paths(user_id, directory)
+    public_path, private_path = _build_paths(user_id, directory)
 
     if not os.path.isfile(public_path) or not os.path.isfile(private_path):
         raise FileNotFoundError(f"No key files found for user '{user_id}'")
 
     # Read public key
-    with open(public_path, "r", encoding="utf-8") as f_pub:
-        lines_pub = [line.strip() for line in f_pub.readlines() if line.strip()]
-    if len(lines_pub) < 2:
+    with open(public_path, "rb") as f_pub:
+        fields_pub = rsa_keyfile.unpack_ints(f_pub.read())
+    if len(fields_pub) < 2:
         raise ValueError(f"Invalid public key file format for user '{user_id}'")
-    n_pub = int(lines_pub[0])
-    e = int(lines_pub[1])
+    n_pub, e = fields_pub[:2]
 
     # Read private key
-    with open(private_path, "r", encoding="utf-8") as f_priv:
-        lines_priv = [line.strip() for line in f_priv.readlines() if line.strip()]
-    if len(lines_priv) < 2:
+    with open(private_path, "rb") as f_priv:
+        fields_priv = rsa_keyfile.unpack_ints(f_priv.read())
+    if len(fields_priv) not in (2, 7):
         raise ValueError(f"Invalid private key file format for user '{user_id}'")
-    n_priv = int(lines_priv[0])
-    d = int(lines_priv[1])
+    n_priv = fields_priv[0]
 
     if n_pub != n_priv:
         raise ValueError("Public and private key modulus (n) do not match.")
 
     public_key: PublicKey = (n_pub, e)
-    private_key: PrivateKey = (n_priv, d)
+    private_key: PrivateKey = tuple(fields_priv)
 
     return public_key, private_key
 
@@ -10,20 +10,25 @@ implementation:
 - gcd(a, b): compute the greatest common divisor of two integers
 - extended_gcd(a, b): extended Euclidean algorithm (returns gcd and coefficients)
 - modinv(a, m): modular inverse of a modulo m
-- is_prime(n): primality test using simple trial division
+- is_prime(n): Miller-Rabin primality test
 - generate_prime(bits): generate a random prime number of a given bit size
 - lcm(a, b): least common multiple of two integers
 """
-from sympy import randprime
+import secrets
+
+import gmpy2
+
+# Miller-Rabin with these witnesses is deterministic below this bound
+MR_DETERMINISTIC_LIMIT = 3317044064679887385961981
+MR_DETERMINISTIC_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+MR_ROUNDS = 40
 
 def gcd(a: int, b: int) -> int:
     """
     Compute the greatest common divisor (GCD) of a and b.
-    Uses the classical Euclidean algorithm.
+    Thin wrapper around gmpy2.gcd (GMP).
     """
-    while b != 0:
-        a, b = b, a % b
-    return a
+    return int(gmpy2.gcd(a, b))
 
 
 def extended_gcd(a: int, b: int):
@@ -33,13 +38,19 @@ def extended_gcd(a: int, b: int):
     Returns a tuple (g, x, y) such that:
         g = gcd(a, b)
         a * x + b * y = g
+
+    Iterative form: keeps only the two most recent remainders and
+    coefficients instead of recursing once per Euclidean step.
     """
-    if b == 0:
-        return a, 1, 0
-    g, x1, y1 = extended_gcd(b, a % b)
-    x = y1
-    y = x1 - (a // b) * y1
-    return g, x, y
+    old_r, r = a, b
+    old_s, s = 1, 0
+    old_t, t = 0, 1
+    while r:
+        q = old_r // r
+        old_r, r = r, old_r - q * r
+        old_s, s = s, old_s - q * s
+        old_t, t = t, old_t - q * t
+    return old_r, old_s, old_t
 
 
 def modinv(a: int, m: int) -> int:
@@ -52,20 +63,67 @@ def modinv(a: int, m: int) -> int:
     Raises ValueError if the inverse does not exist
     (i.e. when gcd(a, m) != 1).
     """
-    g, x, _ = extended_gcd(a, m)
-    if g != 1:
-        raise ValueError(f"No modular inverse exists for {a} modulo {m}")
-    return x % m
+    try:
+        return int(gmpy2.invert(a, m))
+    except ZeroDivisionError:
+        raise ValueError(f"No modular inverse exists for {a} modulo {m}") from None
+
+
+def is_prime(n: int) -> bool:
+    """
+    Test whether n is prime using the Miller-Rabin test.
+
+    Writes n - 1 = d * 2^s and checks each witness a: n passes if
+    a^d == 1 (mod n) or a^(d * 2^r) == n - 1 (mod n) for some r < s.
+
+    Below MR_DETERMINISTIC_LIMIT a fixed witness set makes the answer exact;
+    above it, MR_ROUNDS random witnesses are used (error < 4^-40).
+    """
+    if n < 2:
+        return False
+    for p in MR_DETERMINISTIC_WITNESSES:
+        if n % p == 0:
+            return n == p
+
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    if n < MR_DETERMINISTIC_LIMIT:
+        witnesses = MR_DETERMINISTIC_WITNESSES
+    else:
+        witnesses = [2 + secrets.randbelow(n - 3) for _ in range(MR_ROUNDS)]
+
+    for a in witnesses:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
 
 
 def generate_prime(bits: int) -> int:
     """
-    Generate a random prime number with the given bit length
-    using sympy's randprime function.
+    Generate a random prime number with the given bit length.
+
+    A random odd starting point with the top bit set is drawn from the OS
+    random source (secrets), then gmpy2.next_prime searches upwards from it.
+    In the rare case the search runs past 2^bits, a new start is drawn.
     """
-    lower = 2 ** (bits - 1)
-    upper = 2 ** bits - 1
-    return randprime(lower, upper)
+    if bits < 2:
+        raise ValueError("A prime needs at least 2 bits.")
+    while True:
+        candidate = secrets.randbits(bits) | (1 << (bits - 1)) | 1
+        prime = gmpy2.next_prime(gmpy2.mpz(candidate - 1))
+        if prime.bit_length() == bits:
+            return int(prime)
 
 
 def lcm(a: int, b: int) -> int: